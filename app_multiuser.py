@@ -7,6 +7,7 @@ from datetime import datetime
 import json
 import traceback
 import os
+import math
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
@@ -18,6 +19,9 @@ import utils_multiuser as utils
 from auth import User, init_auth_db
 
 app = Flask(__name__)
+
+# Applied jobs shown per page on /applied (the Excel export always includes all of them)
+APPLIED_PAGE_SIZE = 50
 app.secret_key = os.environ.get('SECRET_KEY', 'jobfinder-secret-key-change-in-production-xyz123')
 
 # Initialize Flask-Login
@@ -47,6 +51,7 @@ def init_app():
     # Create new multi-user database
     database.init_multiuser_db()
     init_auth_db()
+    utils.configure_database()
     # Reset scan flags since threads don't persist across restarts
     utils.reset_all_scan_flags()
     print("✅ Application initialized with multi-user support")
@@ -207,8 +212,8 @@ def dashboard():
             FROM approved_jobs a
             JOIN discovered_jobs d ON a.discovered_job_id = d.id
             WHERE a.user_id = ?
-                AND (a.is_archived IS NULL OR a.is_archived = FALSE)
-                AND (a.is_dismissed IS NULL OR a.is_dismissed = FALSE)
+                AND a.is_archived = FALSE
+                AND a.is_dismissed = FALSE
             ORDER BY a.date_approved DESC
             """
             approved_jobs = conn.execute(query, (current_user.id,)).fetchall()
@@ -217,8 +222,8 @@ def dashboard():
             stats_query = """
             SELECT
                 COUNT(*) as total_discovered,
-                (SELECT COUNT(*) FROM approved_jobs WHERE user_id = ? AND (is_archived IS NULL OR is_archived = FALSE) AND (is_dismissed IS NULL OR is_dismissed = FALSE)) as total_approved,
-                (SELECT COUNT(*) FROM approved_jobs WHERE user_id = ? AND date_applied IS NOT NULL AND (is_archived IS NULL OR is_archived = FALSE)) as total_applied,
+                (SELECT COUNT(*) FROM approved_jobs WHERE user_id = ? AND is_archived = FALSE AND is_dismissed = FALSE) as total_approved,
+                (SELECT COUNT(*) FROM approved_jobs WHERE user_id = ? AND date_applied IS NOT NULL AND is_archived = FALSE) as total_applied,
                 (SELECT COUNT(*) FROM discovered_jobs WHERE user_id = ? AND analyzed = TRUE) as total_analyzed
             FROM discovered_jobs WHERE user_id = ?
             """
@@ -551,14 +556,61 @@ def statistics_page():
 def archived_page():
     """Applied jobs page for current user"""
     try:
-        archived_jobs = database.get_archived_jobs(current_user.id)
+        total_jobs = database.count_archived_jobs(current_user.id)
+        total_pages = max(1, math.ceil(total_jobs / APPLIED_PAGE_SIZE))
+        page = min(max(request.args.get('page', 1, type=int), 1), total_pages)
+
+        archived_jobs = database.get_archived_jobs(current_user.id,
+                                                   limit=APPLIED_PAGE_SIZE,
+                                                   offset=(page - 1) * APPLIED_PAGE_SIZE)
         return render_template('archived.html',
                              jobs=archived_jobs,
+                             total_jobs=total_jobs,
+                             page=page,
+                             total_pages=total_pages,
                              scan_status=database.get_scan_status(current_user.id))
     except Exception as e:
         flash(f'Error loading applied jobs: {str(e)}', 'error')
         return render_template('archived.html', jobs=[], scan_status=database.get_scan_status(current_user.id))
 
+# Excel export styles are immutable, so build them once per process instead of per export
+_EXPORT_HEADER_FILL = PatternFill(start_color="F97316", end_color="F97316", fill_type="solid")
+_EXPORT_HEADER_FONT = Font(bold=True, color="FFFFFF", size=14)
+_EXPORT_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_EXPORT_CELL_FONT = Font(size=14)
+_EXPORT_LINK_FONT = Font(color="0563C1", underline="single", size=14)
+_EXPORT_CELL_ALIGNMENT = Alignment(vertical="top", wrap_text=True)
+_EXPORT_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+_EXPORT_HEADERS = (
+    "Job Title",
+    "Company/Position",
+    "Location",
+    "Keyword Match",
+    "LinkedIn URL",
+    "Date Applied",
+    "Date Approved",
+    "AI Match Reasoning",
+    "Job Description"
+)
+
+_EXPORT_COLUMN_WIDTHS = {
+    'A': 30,  # Job Title
+    'B': 25,  # Company
+    'C': 20,  # Location
+    'D': 20,  # Keyword
+    'E': 50,  # LinkedIn URL
+    'F': 15,  # Date Applied
+    'G': 15,  # Date Approved
+    'H': 60,  # AI Reasoning
+    'I': 70   # Description
+}
+
 @app.route('/api/applied/export')
 @login_required
 def export_applied_jobs():
@@ -576,55 +628,17 @@ def export_applied_jobs():
         ws = wb.active
         ws.title = "Applied Jobs"
 
-        # Define styles
-        header_fill = PatternFill(start_color="F97316", end_color="F97316", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=14)
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        cell_font = Font(size=14)
-        cell_alignment = Alignment(vertical="top", wrap_text=True)
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        # Define headers
-        headers = [
-            "Job Title",
-            "Company/Position",
-            "Location",
-            "Keyword Match",
-            "LinkedIn URL",
-            "Date Applied",
-            "Date Approved",
-            "AI Match Reasoning",
-            "Job Description"
-        ]
-
         # Write headers
-        for col_num, header in enumerate(headers, 1):
+        for col_num, header in enumerate(_EXPORT_HEADERS, 1):
             cell = ws.cell(row=1, column=col_num)
             cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = border
+            cell.fill = _EXPORT_HEADER_FILL
+            cell.font = _EXPORT_HEADER_FONT
+            cell.alignment = _EXPORT_HEADER_ALIGNMENT
+            cell.border = _EXPORT_BORDER
 
         # Set column widths
-        column_widths = {
-            'A': 30,  # Job Title
-            'B': 25,  # Company
-            'C': 20,  # Location
-            'D': 20,  # Keyword
-            'E': 50,  # LinkedIn URL
-            'F': 15,  # Date Applied
-            'G': 15,  # Date Approved
-            'H': 60,  # AI Reasoning
-            'I': 70   # Description
-        }
-
-        for col_letter, width in column_widths.items():
+        for col_letter, width in _EXPORT_COLUMN_WIDTHS.items():
             ws.column_dimensions[col_letter].width = width
 
         # Write data rows
@@ -663,15 +677,15 @@ def export_applied_jobs():
             for col_num, value in enumerate(row_data, 1):
                 cell = ws.cell(row=row_num, column=col_num)
                 cell.value = value
-                cell.alignment = cell_alignment
-                cell.border = border
+                cell.alignment = _EXPORT_CELL_ALIGNMENT
+                cell.border = _EXPORT_BORDER
 
                 # Make URL a hyperlink
                 if col_num == 5 and value and value != 'N/A':
                     cell.hyperlink = value
-                    cell.font = Font(color="0563C1", underline="single", size=14)
+                    cell.font = _EXPORT_LINK_FONT
                 else:
-                    cell.font = cell_font
+                    cell.font = _EXPORT_CELL_FONT
 
         # Freeze first row
         ws.freeze_panes = "A2"
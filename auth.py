@@ -124,6 +124,7 @@ class User(UserMixin):
             conn.execute("DELETE FROM approved_jobs WHERE user_id = ?", (user_id,))
             conn.execute("DELETE FROM discovered_jobs WHERE user_id = ?", (user_id,))
             conn.execute("DELETE FROM user_configs WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM user_config_docs WHERE user_id = ?", (user_id,))
             conn.execute("DELETE FROM user_scan_control WHERE user_id = ?", (user_id,))
             conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
             return True
@@ -3,13 +3,24 @@
 from pathlib import Path
 import sqlite3
 from contextlib import contextmanager
-from typing import Iterable, Dict, Any, Optional, Tuple, List
+from typing import Iterable, Dict, Any, Optional, Tuple, List, Set
 import re
 import json
+import queue
+import threading
+import time
 from datetime import datetime
 
 DB_PATH = "jobfinder.db"
 
+# Applied-jobs pages are re-read on every view/export but change only through
+# the approved_jobs writers below, which invalidate this cache.
+ARCHIVED_JOBS_CACHE_TTL = 60  # seconds
+_archived_jobs_cache: Dict[int, Dict[Any, Tuple[float, Any]]] = {}
+# Bumped on every invalidation, so a read that raced a write never caches the old result
+_archived_jobs_generations: Dict[int, int] = {}
+_archived_jobs_lock = threading.Lock()
+
 # Regular expression for extracting job IDs
 _JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/?]*-)?(\d+)(?:[/?]|$)")
 
@@ -19,6 +30,8 @@ def get_conn():
     """Context‑managed connection that commits on success and rolls back on error."""
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    # Per-connection setting; safe under WAL and saves an fsync on every scraper commit
+    conn.execute("PRAGMA synchronous=NORMAL")
     try:
         yield conn
         conn.commit()
@@ -29,6 +42,42 @@ def get_conn():
         conn.close()
 
 
+# Small process-wide pool of long-lived connections for the hot config/preset
+# reads and writes, so they skip reconnecting and re-warming the page cache.
+POOL_SIZE = 4
+_conn_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=POOL_SIZE)
+
+
+def _new_pooled_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    return conn
+
+
+@contextmanager
+def pooled_conn():
+    """Like get_conn, but borrows a connection from the process-wide pool instead of opening one."""
+    try:
+        conn = _conn_pool.get_nowait()
+    except queue.Empty:
+        conn = _new_pooled_connection()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            _conn_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
 def init_multiuser_db() -> None:
     """Initialize database with multi-user support"""
     try:
@@ -93,6 +142,18 @@ def init_multiuser_db() -> None:
             ON approved_jobs(user_id)
             """)
 
+            # Applied-jobs page: filter on archive state and read rows pre-sorted by date_applied
+            conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_approved_jobs_user_archived_applied
+            ON approved_jobs(user_id, is_archived, date_applied DESC)
+            """)
+
+            # Joins from discovered_jobs back to approved_jobs (statistics)
+            conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_approved_jobs_discovered_job_id
+            ON approved_jobs(discovered_job_id)
+            """)
+
             # Add is_dismissed column if it doesn't exist (migration)
             try:
                 conn.execute("SELECT is_dismissed FROM approved_jobs LIMIT 1")
@@ -100,6 +161,10 @@ def init_multiuser_db() -> None:
                 conn.execute("ALTER TABLE approved_jobs ADD COLUMN is_dismissed BOOLEAN DEFAULT FALSE")
                 print("✅ Added is_dismissed column to approved_jobs table")
 
+            # Backfill NULL flags so queries can use plain equality (and the indexes) on them
+            conn.execute("UPDATE approved_jobs SET is_archived = FALSE WHERE is_archived IS NULL")
+            conn.execute("UPDATE approved_jobs SET is_dismissed = FALSE WHERE is_dismissed IS NULL")
+
             # Create user_configs table for per-user configuration
             conn.execute("""
             CREATE TABLE IF NOT EXISTS user_configs (
@@ -113,6 +178,16 @@ def init_multiuser_db() -> None:
             )
             """)
 
+            # Whole per-user configuration stored as a single JSON document
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_config_docs (
+                user_id INTEGER PRIMARY KEY,
+                config_json TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+            """)
+
             # Create user_scan_control table
             conn.execute("""
             CREATE TABLE IF NOT EXISTS user_scan_control (
@@ -132,13 +207,19 @@ def init_multiuser_db() -> None:
                 preset_name TEXT NOT NULL,
                 display_name TEXT,
                 description TEXT,
-                config_data TEXT NOT NULL,
+                config_data BLOB NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                 UNIQUE(user_id, preset_name)
             )
             """)
 
+            # Preset list: read a user's presets pre-sorted newest first
+            conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_user_presets_user_created
+            ON user_presets(user_id, created_at DESC)
+            """)
+
             print("✅ Multi-user database initialized")
 
     except Exception as e:
@@ -148,27 +229,43 @@ def init_multiuser_db() -> None:
 
 # -- User-scoped database operations ------------------------------------------
 
-def insert_stub(user_id: int, job_id: int, url: str, location: str, keyword: str) -> bool:
-    """Insert a new job stub for a specific user"""
-    sql = """
+def insert_stubs_batch(user_id: int, stubs: List[Tuple[int, str, str, str]]) -> Set[int]:
+    """Insert (job_id, url, location, keyword) stubs for a user in one transaction.
+
+    Returns the job_ids that were not already stored for this user.
+    """
+    if not stubs:
+        return set()
+
+    job_ids = [stub[0] for stub in stubs]
+    placeholders = ", ".join("?" * len(job_ids))
+    select_sql = f"SELECT job_id FROM discovered_jobs WHERE user_id = ? AND job_id IN ({placeholders});"
+    insert_sql = """
     INSERT OR IGNORE INTO discovered_jobs (user_id, job_id, url, location, keyword)
     VALUES (?, ?, ?, ?, ?);
     """
     try:
         with get_conn() as conn:
-            cursor = conn.execute(sql, (user_id, job_id, url, location, keyword))
-            return cursor.rowcount > 0
+            # Take the write lock up front so the existence check and insert are atomic
+            conn.execute("BEGIN IMMEDIATE")
+            existing = {row['job_id'] for row in conn.execute(select_sql, (user_id, *job_ids))}
+            conn.executemany(insert_sql, [(user_id, *stub) for stub in stubs])
+        return set(job_ids) - existing
     except Exception as e:
-        print(f"Error inserting job stub: {e}")
-        return False
+        print(f"Error inserting job stubs: {e}")
+        return set()
 
 
-def row_missing_details(user_id: int, job_id: int) -> bool:
-    """Check if job is missing title/description for a specific user"""
-    sql = "SELECT title FROM discovered_jobs WHERE user_id = ? AND job_id = ?;"
+def get_job_ids_missing_details(user_id: int, job_ids: Iterable[int]) -> Set[int]:
+    """Return the subset of job_ids that are missing their title for a specific user"""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return set()
+
+    placeholders = ", ".join("?" * len(job_ids))
+    sql = f"SELECT job_id FROM discovered_jobs WHERE user_id = ? AND job_id IN ({placeholders}) AND title IS NULL;"
     with get_conn() as conn:
-        row = conn.execute(sql, (user_id, job_id)).fetchone()
-        return row is None or row['title'] is None
+        return {row['job_id'] for row in conn.execute(sql, (user_id, *job_ids))}
 
 
 def update_details(user_id: int, job_id: int, title: Optional[str], desc: Optional[str]) -> None:
@@ -182,6 +279,13 @@ def update_details(user_id: int, job_id: int, title: Optional[str], desc: Option
         conn.execute(sql, (title, desc, user_id, job_id))
 
 
+def needs_analysis(user_id: int, job_id: int) -> bool:
+    """Check if a job still has to be analyzed for a specific user"""
+    sql = "SELECT 1 FROM discovered_jobs WHERE user_id = ? AND job_id = ? AND analyzed = FALSE;"
+    with get_conn() as conn:
+        return conn.execute(sql, (user_id, job_id)).fetchone() is not None
+
+
 def mark_job_as_analyzed(user_id: int, job_id: int) -> None:
     """Mark job as analyzed for a specific user"""
     sql = "UPDATE discovered_jobs SET analyzed = TRUE WHERE user_id = ? AND job_id = ?;"
@@ -222,7 +326,8 @@ def mark_job_as_applied(user_id: int, approved_job_pk: int) -> bool:
     try:
         with get_conn() as conn:
             cursor = conn.execute(sql, (user_id, approved_job_pk))
-            return cursor.rowcount > 0
+        _invalidate_archived_jobs(user_id)
+        return cursor.rowcount > 0
     except Exception as e:
         print(f"Error marking job as applied: {e}")
         return False
@@ -238,7 +343,8 @@ def delete_approved_job(user_id: int, approved_job_pk: int) -> bool:
     try:
         with get_conn() as conn:
             cursor = conn.execute(sql, (user_id, approved_job_pk))
-            return cursor.rowcount > 0
+        _invalidate_archived_jobs(user_id)
+        return cursor.rowcount > 0
     except Exception as e:
         print(f"Error dismissing approved job: {e}")
         return False
@@ -249,7 +355,8 @@ def clear_all_approved_jobs(user_id: int) -> int:
     sql = "DELETE FROM approved_jobs WHERE user_id = ?;"
     with get_conn() as conn:
         cursor = conn.execute(sql, (user_id,))
-        return cursor.rowcount
+    _invalidate_archived_jobs(user_id)
+    return cursor.rowcount
 
 
 def clear_all_discovered_jobs(user_id: int) -> int:
@@ -258,7 +365,8 @@ def clear_all_discovered_jobs(user_id: int) -> int:
         with get_conn() as conn:
             conn.execute("DELETE FROM approved_jobs WHERE user_id = ?", (user_id,))
             cursor = conn.execute("DELETE FROM discovered_jobs WHERE user_id = ?", (user_id,))
-            return cursor.rowcount
+        _invalidate_archived_jobs(user_id)
+        return cursor.rowcount
     except Exception as e:
         print(f"Error clearing discovered jobs: {e}")
         return 0
@@ -269,11 +377,12 @@ def archive_all_applied_jobs(user_id: int) -> int:
     sql = """
     UPDATE approved_jobs
     SET is_archived = TRUE
-    WHERE user_id = ? AND date_applied IS NOT NULL AND (is_archived IS NULL OR is_archived = FALSE) AND (is_dismissed IS NULL OR is_dismissed = FALSE);
+    WHERE user_id = ? AND date_applied IS NOT NULL AND is_archived = FALSE AND is_dismissed = FALSE;
     """
     with get_conn() as conn:
         cursor = conn.execute(sql, (user_id,))
-        return cursor.rowcount
+    _invalidate_archived_jobs(user_id)
+    return cursor.rowcount
 
 
 # -- Scan control functions --
@@ -306,6 +415,16 @@ def set_scan_active(user_id: int, active: bool) -> None:
         conn.execute(sql, (user_id, active))
 
 
+def set_scan_state(user_id: int, stop: bool, active: bool) -> None:
+    """Set both the stop flag and the active status for a user in one write"""
+    sql = """
+    INSERT OR REPLACE INTO user_scan_control (user_id, stop_scan_flag, scan_active)
+    VALUES (?, ?, ?);
+    """
+    with get_conn() as conn:
+        conn.execute(sql, (user_id, stop, active))
+
+
 def is_scan_active(user_id: int) -> bool:
     """Check if scan is active for a specific user"""
     sql = "SELECT scan_active FROM user_scan_control WHERE user_id = ?;"
@@ -327,8 +446,8 @@ def get_scan_status(user_id: int) -> Dict[str, Any]:
             stats = conn.execute("""
                 SELECT
                     COUNT(*) as total_discovered,
-                    (SELECT COUNT(*) FROM approved_jobs WHERE user_id = ? AND (is_archived IS NULL OR is_archived = FALSE) AND (is_dismissed IS NULL OR is_dismissed = FALSE)) as total_approved,
-                    (SELECT COUNT(*) FROM approved_jobs WHERE user_id = ? AND date_applied IS NOT NULL AND (is_archived IS NULL OR is_archived = FALSE)) as total_applied,
+                    (SELECT COUNT(*) FROM approved_jobs WHERE user_id = ? AND is_archived = FALSE AND is_dismissed = FALSE) as total_approved,
+                    (SELECT COUNT(*) FROM approved_jobs WHERE user_id = ? AND date_applied IS NOT NULL AND is_archived = FALSE) as total_applied,
                     (SELECT COUNT(*) FROM discovered_jobs WHERE user_id = ? AND analyzed = TRUE) as total_analyzed
                 FROM discovered_jobs WHERE user_id = ?
             """, (user_id, user_id, user_id, user_id)).fetchone()
@@ -389,8 +508,54 @@ def get_jobs_missing_content(user_id: int) -> List[Tuple[int, str]]:
         return [(row['job_id'], row['url']) for row in rows]
 
 
-def get_archived_jobs(user_id: int) -> List[Dict[str, Any]]:
-    """Get all archived applied jobs for a specific user"""
+def _invalidate_archived_jobs(user_id: int) -> None:
+    """Drop the cached applied-jobs pages and count for a user after approved_jobs changes"""
+    with _archived_jobs_lock:
+        _archived_jobs_generations[user_id] = _archived_jobs_generations.get(user_id, 0) + 1
+        _archived_jobs_cache.pop(user_id, None)
+
+
+def _get_cached_archived(user_id: int, key: Any) -> Any:
+    """Return a cached applied-jobs value for a user, or None if missing or expired"""
+    with _archived_jobs_lock:
+        user_cache = _archived_jobs_cache.get(user_id)
+        cached = user_cache.get(key) if user_cache else None
+        if cached is None:
+            return None
+        if time.monotonic() - cached[0] < ARCHIVED_JOBS_CACHE_TTL:
+            return cached[1]
+        # Expired: drop it so large export lists don't linger until the next write
+        del user_cache[key]
+        if not user_cache:
+            del _archived_jobs_cache[user_id]
+        return None
+
+
+def _archived_generation(user_id: int) -> int:
+    """Current invalidation generation for a user's applied-jobs cache; read before querying"""
+    return _archived_jobs_generations.get(user_id, 0)
+
+
+def _set_cached_archived(user_id: int, key: Any, value: Any, generation: int) -> None:
+    """Cache *value* unless the user's applied jobs changed since *generation* was read"""
+    with _archived_jobs_lock:
+        if _archived_jobs_generations.get(user_id, 0) == generation:
+            _archived_jobs_cache.setdefault(user_id, {})[key] = (time.monotonic(), value)
+
+
+def get_archived_jobs(user_id: int, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+    """Get archived applied jobs for a specific user, newest first.
+
+    Pass limit/offset to fetch one page; without a limit every job is returned.
+    Results are cached per user for ARCHIVED_JOBS_CACHE_TTL seconds; callers
+    must treat the returned list as read-only.
+    """
+    cache_key = (limit, offset)
+    cached = _get_cached_archived(user_id, cache_key)
+    if cached is not None:
+        return cached
+    generation = _archived_generation(user_id)
+
     sql = """
     SELECT
         a.id as approved_id,
@@ -405,12 +570,38 @@ def get_archived_jobs(user_id: int) -> List[Dict[str, Any]]:
         d.description
     FROM approved_jobs a
     JOIN discovered_jobs d ON a.discovered_job_id = d.id
-    WHERE a.user_id = ? AND a.is_archived = TRUE AND (a.is_dismissed IS NULL OR a.is_dismissed = FALSE)
+    WHERE a.user_id = ? AND a.is_archived = TRUE AND a.is_dismissed = FALSE
     ORDER BY a.date_applied DESC
     """
+    params: Tuple[Any, ...] = (user_id,)
+    if limit is not None:
+        sql += "LIMIT ? OFFSET ?"
+        params += (limit, offset)
+
     with get_conn() as conn:
-        rows = conn.execute(sql, (user_id,)).fetchall()
-        return [dict(row) for row in rows]
+        rows = conn.execute(sql, params).fetchall()
+    jobs = [dict(row) for row in rows]
+    _set_cached_archived(user_id, cache_key, jobs, generation)
+    return jobs
+
+
+def count_archived_jobs(user_id: int) -> int:
+    """Count archived applied jobs for a specific user (cached like get_archived_jobs)"""
+    cached = _get_cached_archived(user_id, "count")
+    if cached is not None:
+        return cached
+    generation = _archived_generation(user_id)
+
+    sql = """
+    SELECT COUNT(*) as count
+    FROM approved_jobs
+    WHERE user_id = ? AND is_archived = TRUE AND is_dismissed = FALSE
+    """
+    with get_conn() as conn:
+        row = conn.execute(sql, (user_id,)).fetchone()
+    count = row['count'] if row else 0
+    _set_cached_archived(user_id, "count", count, generation)
+    return count
 
 
 def get_job_statistics(user_id: int) -> Dict[str, Any]:
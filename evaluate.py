@@ -9,20 +9,72 @@ except ImportError:
 
 import os
 import json
+import threading
+from functools import lru_cache
 from typing import List, Dict, Any, Callable, Optional
 
 import openai
 import google.generativeai as genai
 from google.generativeai import types as gen_types
 
+try:
+    # orjson is an optional, faster drop-in for parsing model responses
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 # Global configs will be loaded per-user
 
 #_OPENAI_MODEL = "gpt-4.1-mini"  # OpenAI model identifier
 _OPENAI_MODEL = "o3"  # OpenAI model identifier
 _GEMINI_MODEL = "models/gemini-2.5-flash-preview-04-17"
 
+# OpenAI clients keyed by API key, shared by every evaluation in this process
+_OPENAI_CLIENTS: Dict[str, "openai.OpenAI"] = {}
+_OPENAI_CLIENTS_LOCK = threading.Lock()
+
 _FENCE_RE = re.compile(r"^```(?:json)?\n|\n```$", re.S)
 
+# Unicode punctuation to ASCII equivalents, applied with str.translate
+_ASCII_REPLACEMENTS = str.maketrans({
+    '\u2011': '-',  # Non-breaking hyphen
+    '\u2013': '-',  # En dash
+    '\u2014': '-',  # Em dash
+    '\u2018': "'",  # Left single quote
+    '\u2019': "'",  # Right single quote
+    '\u201c': '"',  # Left double quote
+    '\u201d': '"',  # Right double quote
+})
+
+# Soft caps on prompt inputs; scraped descriptions are often padded with
+# company blurbs, benefits and EEO text that only cost tokens
+MAX_DESCRIPTION_CHARS = 5000
+MAX_RESUME_CHARS = 4000
+# Opening text always kept ahead of the anchored section; clearance, citizenship
+# and employment-type statements often sit there
+TRIM_HEAD_CHARS = 1000
+
+_DESCRIPTION_ANCHOR_RE = re.compile(r"\b(?:requirements|responsibilities|qualifications)\b", re.I)
+_RESUME_ANCHOR_RE = re.compile(r"\b(?:experience|skills)\b", re.I)
+
+_PROMPT_PREAMBLE = (
+    "You are an AI recruiter assistant.\n"
+    "You are a helpful assistant that evaluates job postings with a realistic understanding of hiring practices. "
+    "Remember that many job 'requirements' are actually preferences, and hiring managers often consider candidates who meet 70-80% of listed requirements. "
+    "Analyse the following LinkedIn job description and determine whether the "
+    "candidate is eligible for the role."
+    "Assume the candidate is eligible via US citizenship or residency requirements."
+)
+
+_PROMPT_SCHEMA = (
+    "\n\nRespond using ONLY valid JSON with the following schema:\n"
+    "{\n"
+    "  \"eligible\": bool,\n"
+    "  \"reasoning\": str,\n"
+    "  \"missing_requirements\": [str]\n"
+    "}"
+)
+
 
 
 def contains_exclusions(title, exclusion_keywords=None):
@@ -31,89 +83,105 @@ def contains_exclusions(title, exclusion_keywords=None):
     """
     if not exclusion_keywords:
         return False
-    return any(re.search(rf"(?<!\w){re.escape(word)}(?!\w)", title, re.I)
-               for word in exclusion_keywords)
+    return _exclusion_pattern(tuple(exclusion_keywords)).search(title) is not None
+
+@lru_cache(maxsize=32)
+def _exclusion_pattern(keywords: tuple) -> re.Pattern:
+    """Compile all exclusion keywords into one whole-word alternation, matched in a single scan."""
+    alternation = "|".join(re.escape(word) for word in keywords)
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.I)
 
 def sanitize_text(text: str) -> str:
     """
     Remove or replace non-ASCII characters.
     Replaces common Unicode punctuation with ASCII equivalents.
     """
-    # Dictionary of Unicode to ASCII replacements
-    replacements = {
-        '\u2011': '-',  # Non-breaking hyphen
-        '\u2013': '-',  # En dash
-        '\u2014': '-',  # Em dash
-        '\u2018': "'",  # Left single quote
-        '\u2019': "'",  # Right single quote
-        '\u201c': '"',  # Left double quote
-        '\u201d': '"',  # Right double quote
-    }
-
-    # Replace known Unicode characters
-    for unicode_char, ascii_char in replacements.items():
-        text = text.replace(unicode_char, ascii_char)
-
-    # Remove any remaining non-ASCII characters
-    return ''.join(char for char in text if ord(char) < 128)
+    # Replace known Unicode characters in one pass, then drop anything else outside ASCII
+    return text.translate(_ASCII_REPLACEMENTS).encode('ascii', 'ignore').decode('ascii')
 
-def prompt_eligibility(job_description: str, user_config: dict, resume: Optional[str] = None) -> str:
-    base = (
-        "You are an AI recruiter assistant.\n"
-        "You are a helpful assistant that evaluates job postings with a realistic understanding of hiring practices. "
-        "Remember that many job 'requirements' are actually preferences, and hiring managers often consider candidates who meet 70-80% of listed requirements. "
-        "Analyse the following LinkedIn job description and determine whether the "
-        "candidate is eligible for the role."
-        "Assume the candidate is eligible via US citizenship or residency requirements."
-    )
+def _trim_to_section(text: str, max_chars: int, anchor_re: re.Pattern) -> str:
+    """Cut *text* down to about *max_chars*: the first TRIM_HEAD_CHARS characters,
+    then a window starting at the first anchor section after them.
 
+    The window is pulled back from the end of the text so a late anchor never
+    yields fewer than *max_chars* characters in total.
+    """
+    if len(text) <= max_chars:
+        return text
+    head_chars = min(TRIM_HEAD_CHARS, max_chars)
+    m = anchor_re.search(text, head_chars)
+    if not m:
+        return text[:max_chars]
+    window = max_chars - head_chars
+    start = max(min(m.start(), len(text) - window), head_chars)
+    return text[:head_chars] + " ... " + text[start:start + window]
+
+def _trim_description(text: str, max_chars: int = MAX_DESCRIPTION_CHARS) -> str:
+    """Keep the requirements/responsibilities part of a long job description."""
+    return _trim_to_section(text, max_chars, _DESCRIPTION_ANCHOR_RE)
+
+def _trim_resume(text: str, max_chars: int = MAX_RESUME_CHARS) -> str:
+    """Keep the experience/skills part of a long resume."""
+    return _trim_to_section(text, max_chars, _RESUME_ANCHOR_RE)
+
+def prompt_eligibility(job_description: str, user_config: dict, resume: Optional[str] = None) -> str:
     # Add evaluation criteria from user config
-    prompts_config = user_config.get('prompts', {})
-    if 'evaluation_prompt' in prompts_config:
-        base += f"\n\nEvaluation Criteria:\n{prompts_config['evaluation_prompt']}"
+    evaluation_prompt = user_config.get('prompts', {}).get('evaluation_prompt')
 
     # Use user's resume if provided, fallback to user config resume
     if not resume:
         resume = user_config.get('resume', {}).get('text')
 
+    parts = [_PROMPT_PREAMBLE]
+    if evaluation_prompt is not None:
+        parts.append(f"\n\nEvaluation Criteria:\n{evaluation_prompt}")
+    parts.append(f"\n\nJob Description:\n{sanitize_text(_trim_description(job_description.strip()))}")
     if resume:
-        base += f"\n\nJob Description:\n{sanitize_text(job_description.strip())}\n\nCandidate Resume:\n{sanitize_text(resume.strip())}"
-    else:
-        base += f"\n\nJob Description:\n{sanitize_text(job_description.strip())}"
-    base += (
-        "\n\nRespond using ONLY valid JSON with the following schema:\n"
-        "{\n"
-        "  \"eligible\": bool,\n"
-        "  \"reasoning\": str,\n"
-        "  \"missing_requirements\": [str]\n"
-        "}"
-    )
-    return base
+        parts.append(f"\n\nCandidate Resume:\n{sanitize_text(_trim_resume(resume.strip()))}")
+    parts.append(_PROMPT_SCHEMA)
+    return "".join(parts)
+
+def _get_openai_client(api_key: str) -> openai.OpenAI:
+    """Return a process-wide OpenAI client for *api_key*, creating it on first use.
+
+    Reusing the client keeps its httpx connection pool (and TLS sessions) alive
+    across jobs instead of reconnecting to the API for every evaluation.
+    """
+    client = _OPENAI_CLIENTS.get(api_key)
+    if client is not None:
+        return client
 
-def call_openai(prompt: str, api_key: str) -> Dict[str, Any]:
     import httpx
 
+    with _OPENAI_CLIENTS_LOCK:
+        client = _OPENAI_CLIENTS.get(api_key)
+        if client is None:
+            # Create a custom httpx client without proxy support to avoid the 'proxies' error
+            http_client = httpx.Client(
+                timeout=60.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+            )
+
+            # Create OpenAI client with custom HTTP client
+            client = openai.OpenAI(
+                api_key=api_key,
+                http_client=http_client
+            )
+            _OPENAI_CLIENTS[api_key] = client
+    return client
+
+def call_openai(prompt: str, api_key: str) -> Dict[str, Any]:
     # Ensure the prompt is ASCII-only
     sanitized_prompt = sanitize_text(prompt)
 
-    # Create a custom httpx client without proxy support to avoid the 'proxies' error
-    http_client = httpx.Client(
-        timeout=60.0,
-        limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-    )
-
-    # Create OpenAI client with custom HTTP client
-    client = openai.OpenAI(
-        api_key=api_key,
-        http_client=http_client
-    )
+    client = _get_openai_client(api_key)
 
     response = client.chat.completions.create(
         model=_OPENAI_MODEL,
         messages=[{"role": "user", "content": sanitized_prompt}],
         response_format={"type": "json_object"},
     )
-    return json.loads(response.choices[0].message.content)
+    return _json_loads(response.choices[0].message.content)
 
 def call_gemini(prompt: str, user_config: dict) -> dict:
     google_api_key = user_config.get("api_keys", {}).get("google_api_key")
@@ -134,7 +202,7 @@ def call_gemini(prompt: str, user_config: dict) -> dict:
         prompt,
     )
     txt = _FENCE_RE.sub("", resp.text.strip())
-    return json.loads(txt)
+    return _json_loads(txt)
 
 
 def analyze_job(
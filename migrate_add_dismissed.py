@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Migration script to add is_dismissed column to approved_jobs table.
+Migration script to add is_dismissed column to approved_jobs table
+and the indexes used by the applied-jobs page.
 Run this on the remote server to update the database structure.
 
 Usage: python3 migrate_add_dismissed.py
@@ -12,26 +13,54 @@ import sys
 DB_PATH = "jobfinder.db"
 
 def migrate():
-    """Add is_dismissed column to approved_jobs table"""
+    """Add is_dismissed column and applied-jobs indexes to approved_jobs table"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        # Autocommit mode: the transaction below is managed explicitly
+        conn = sqlite3.connect(DB_PATH, isolation_level=None)
         cursor = conn.cursor()
 
-        # Check if column already exists
-        cursor.execute("PRAGMA table_info(approved_jobs)")
-        columns = [row[1] for row in cursor.fetchall()]
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
 
-        if 'is_dismissed' in columns:
-            print("✅ Column 'is_dismissed' already exists. No migration needed.")
-            conn.close()
-            return True
+        # Run every schema/data change in one write transaction (one journal sync)
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Add the column; SQLite rejects a duplicate column immediately, so no table_info probe
+            try:
+                cursor.execute("ALTER TABLE approved_jobs ADD COLUMN is_dismissed BOOLEAN DEFAULT 0")
+                print("✅ Successfully added 'is_dismissed' column to approved_jobs table")
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e).lower():
+                    raise
+                print("✅ Column 'is_dismissed' already exists.")
 
-        # Add the column
-        print("Adding 'is_dismissed' column to approved_jobs table...")
-        cursor.execute("ALTER TABLE approved_jobs ADD COLUMN is_dismissed BOOLEAN DEFAULT FALSE")
-        conn.commit()
+            # Backfill NULL flags so the applied-jobs filter can be a plain equality
+            cursor.execute("UPDATE approved_jobs SET is_archived = FALSE WHERE is_archived IS NULL")
+            cursor.execute("UPDATE approved_jobs SET is_dismissed = FALSE WHERE is_dismissed IS NULL")
+
+            # Indexes for the applied-jobs filter/sort and the approved -> discovered join
+            print("Creating applied-jobs indexes...")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_approved_jobs_user_archived_applied
+                ON approved_jobs(user_id, is_archived, date_applied DESC)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_approved_jobs_discovered_job_id
+                ON approved_jobs(discovered_job_id)
+            """)
+            # Refresh planner statistics so the new indexes are actually chosen
+            cursor.execute("ANALYZE")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        print("✅ Applied-jobs indexes are in place")
+
+        # VACUUM cannot run inside a transaction
+        print("Compacting database...")
+        cursor.execute("VACUUM")
 
-        print("✅ Successfully added 'is_dismissed' column to approved_jobs table")
         conn.close()
         return True
 
@@ -41,7 +70,7 @@ def migrate():
 
 if __name__ == "__main__":
     print("=" * 60)
-    print("JobFinder Database Migration: Add is_dismissed column")
+    print("JobFinder Database Migration: Add is_dismissed column and indexes")
     print("=" * 60)
 
     success = migrate()
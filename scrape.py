@@ -1,7 +1,9 @@
 # scrape.py
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import evaluate
 from evaluate import analyze_job
 import json, html, re, urllib
@@ -34,6 +36,22 @@ HEADERS = {
 
 _JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/?]*-)?(\d+)(?:[/?]|$)")
 
+# Description clean-up patterns, compiled once for every scraped job
+_TAG_RE = re.compile(r"<[^<]+?>")
+_WS_RE = re.compile(r"\s+")
+_BULLET_RE = re.compile(r"\s*•\s*")
+_DASH_RE = re.compile(r"\s*-\s*")
+_DECORATED_JOB_RE = re.compile(r"decoratedJobPosting\":({.*?})},\"applyMethod", re.DOTALL)
+
+# Common LinkedIn boilerplate, merged into one alternation so the description is scanned once
+_BOILERPLATE_RE = re.compile(
+    r"Pay Range:.*"
+    r"|The specific compensation.*"
+    r"|Full job description.*"
+    r"|About the job.*",
+    re.IGNORECASE,
+)
+
 def shuffled(seq: Sequence[T]) -> List[T]:
     """Return a new list containing all items from *seq* in random order."""
     tmp = list(seq)          # copy so the caller's list is untouched
@@ -139,15 +157,34 @@ def get_searches(user_id):
 
     return searches
 
-def get_soup(url):
+def make_session() -> requests.Session:
+    """Create a Session that keeps LinkedIn connections alive between fetches.
+
+    One per scrape run is shared by the fetch threads, so page requests draw on
+    the adapter's urllib3 connection pool (sized for them) and reuse TCP/TLS
+    connections instead of reconnecting. requests does not document Session
+    itself as thread-safe; the fetches only issue plain GETs through it.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_soup(url, session: Optional[requests.Session] = None, parse_only: Optional[SoupStrainer] = None):
+    """Fetch *url* and parse it with lxml; pass *parse_only* to build just the tags you need."""
     HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                   "(KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
     }
     soup = None
-    resp = requests.get(url, headers=HEADERS)
+    resp = (session or requests).get(url, headers=HEADERS)
     if resp.status_code == 200:
-        soup =  BeautifulSoup(resp.text, 'html.parser')
+        soup =  BeautifulSoup(resp.text, 'lxml', parse_only=parse_only)
     return soup
 
 def extract_job_urls(soups, user_id=None):
@@ -188,29 +225,18 @@ def clean_description(raw_html: str) -> str:
     # First, decode HTML entities
     decoded = html.unescape(raw_html)
 
-    # Remove nested tags, keeping their text content
-    def strip_tags(text):
-        return re.sub('<[^<]+?>', '', text)
-
-    # Remove all HTML tags
-    no_tags = strip_tags(decoded)
+    # Remove all HTML tags, keeping their text content
+    no_tags = _TAG_RE.sub('', decoded)
 
     # Replace multiple newlines/spaces with single space
-    cleaned = re.sub(r'\s+', ' ', no_tags)
+    cleaned = _WS_RE.sub(' ', no_tags)
 
     # Optional: Convert list-like structures to more readable format
-    cleaned = re.sub(r'\s*•\s*', '\n• ', cleaned)
-    cleaned = re.sub(r'\s*-\s*', '\n- ', cleaned)
+    cleaned = _BULLET_RE.sub('\n• ', cleaned)
+    cleaned = _DASH_RE.sub('\n- ', cleaned)
 
     # Remove common LinkedIn boilerplate
-    boilerplate_patterns = [
-        r'Pay Range:.*',
-        r'The specific compensation.*',
-        r'Full job description.*',
-        r'About the job.*'
-    ]
-    for pattern in boilerplate_patterns:
-        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+    cleaned = _BOILERPLATE_RE.sub('', cleaned)
 
     return cleaned.strip()
 
@@ -250,9 +276,7 @@ def extract_job_description(job_soup):
             return clean_description(data["description"])
 
     # 2) fallback to decoratedJobPosting = {...};
-    pattern = re.compile(r"decoratedJobPosting\":({.*?})},\"applyMethod",
-                         re.DOTALL)
-    m = pattern.search(job_soup.text)
+    m = _DECORATED_JOB_RE.search(job_soup.text)
     if m:
         data = json.loads(m.group(1))
         if "description" in data:
@@ -319,14 +343,11 @@ def get_jobs():
         #job_urls.extend(extract_job_urls(soup))
 
 
-    seen = set()
-    unique_jobs = []
-
+    # First job seen for each URL wins; dicts keep insertion order
+    unique_jobs = {}
     for job in jobs:
-        if job["url"] not in seen:
-            seen.add(job["url"])
-            unique_jobs.append(job)
-    return unique_jobs
+        unique_jobs.setdefault(job["url"], job)
+    return list(unique_jobs.values())
 
 def get_job_data(job):
     url = job["url"]
@@ -449,10 +470,10 @@ def _fetch_and_update(job: dict, stop_signal=None) -> None:
 
 
 
-def _safe_fetch(url: str) -> Optional[str]:
+def _safe_fetch(url: str, session: Optional[requests.Session] = None) -> Optional[str]:
     delay = BASE_DELAY
     for _ in range(RETRIES):
-        r = requests.get(url, headers=HEADERS, timeout=15)
+        r = (session or requests).get(url, headers=HEADERS, timeout=15)
         if r.status_code == 200:
             return r.text
         if r.status_code in (429, 502, 503, 504):
@@ -463,12 +484,12 @@ def _safe_fetch(url: str) -> Optional[str]:
     return None
 
 
-def _fetch_guest(job_id: int) -> tuple[Optional[str], Optional[str]]:
+def _fetch_guest(job_id: int, session: Optional[requests.Session] = None) -> tuple[Optional[str], Optional[str]]:
     url  = f"https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
-    html = _safe_fetch(url)
+    html = _safe_fetch(url, session)
     if not html:
         return None, None
-    soup = BeautifulSoup(html, "html.parser")
+    soup = BeautifulSoup(html, "lxml")
 
     t_el = soup.find("h2", class_="top-card-layout__title")
     d_el = soup.find("div", class_="description__text") or \
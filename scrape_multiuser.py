@@ -1,12 +1,16 @@
 # scrape_multiuser.py - Multi-user scraping wrapper
 
 import sys
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+from bs4 import SoupStrainer
 import database_multiuser as database
 from scrape import (
     get_searches,
     show_progress,
     get_soup,
+    make_session,
     canonical_job_url,
     extract_job_id,
     extract_job_description,
@@ -16,8 +20,14 @@ from scrape import (
 )
 from evaluate_multiuser import analyze_job_for_user
 
+# Concurrent job-page fetches per search page
+MAX_FETCH_WORKERS = 8
 
-def scrape_phase_for_user(user_id: int, stop_signal: List[bool]) -> tuple[int, int]:
+# Search pages are only mined for links, so skip building the rest of the tree
+_LINK_STRAINER = SoupStrainer("a", href=True)
+
+
+def scrape_phase_for_user(user_id: int, stop_event: threading.Event) -> tuple[int, int]:
     """
     Conducts the scraping phase for a specific user.
     Returns a tuple: (new_jobs_this_run, total_links_examined)
@@ -28,6 +38,10 @@ def scrape_phase_for_user(user_id: int, stop_signal: List[bool]) -> tuple[int, i
     # Get initial database row count
     start_total_db_rows = database.get_user_job_count(user_id)
 
+    # Load the user's exclusion keywords once for the whole run
+    from utils_multiuser import get_user_config_value
+    exclusion_keywords = get_user_config_value(user_id, "search_parameters.exclusion_keywords", [])
+
     # Get search parameters for this user
     searches = get_searches(user_id)
     total_searches = len(searches)
@@ -41,16 +55,21 @@ def scrape_phase_for_user(user_id: int, stop_signal: List[bool]) -> tuple[int, i
 
     total_links_examined_this_run = 0
 
+    # One pooled HTTP session for every fetch in this run
+    session = make_session()
+
     try:
         for i, search in enumerate(searches, 1):
             # Check both the immediate signal and the persistent DB signal
-            if (stop_signal and stop_signal[0]) or database.should_stop_scan(user_id):
+            if (stop_event and stop_event.is_set()) or database.should_stop_scan(user_id):
                 sys.stdout.write(f"\n[User {user_id}] INFO: Scrape phase received stop signal. Terminating early.\n")
                 sys.stdout.flush()
                 database.set_stop_scan_flag(user_id, False)  # Reset the flag after acknowledging stop
                 break
 
-            links_on_page = process_search_page_for_user(search, user_id, stop_signal) or 0
+            links_on_page = process_search_page_for_user(
+                search, user_id, stop_event, session=session, exclusion_keywords=exclusion_keywords
+            ) or 0
             total_links_examined_this_run += links_on_page
             show_progress(i, total_searches)
 
@@ -58,6 +77,8 @@ def scrape_phase_for_user(user_id: int, stop_signal: List[bool]) -> tuple[int, i
         sys.stdout.write(f"\n[User {user_id}] ⚠️  Interrupted by user during scraping – finishing up current operations…\n")
         sys.stdout.flush()
     finally:
+        session.close()
+
         # Ensure a newline after the progress bar finishes or is interrupted
         sys.stdout.write("\n")
         sys.stdout.flush()
@@ -75,28 +96,29 @@ def scrape_phase_for_user(user_id: int, stop_signal: List[bool]) -> tuple[int, i
         return new_jobs_this_run, total_links_examined_this_run
 
 
-def process_search_page_for_user(search, user_id: int, stop_signal=None) -> int:
+def process_search_page_for_user(search, user_id: int, stop_event=None, session=None,
+                                 exclusion_keywords: Optional[List[str]] = None) -> int:
     """Process a search page for a specific user"""
     handled = 0
     jobs_for_update = []
+    stubs = {}
 
     # Check for stop signal before starting
-    if stop_signal and stop_signal[0]:
+    if stop_event and stop_event.is_set():
         return 0
 
-    soup = get_soup(search["url"])
+    soup = get_soup(search["url"], session=session, parse_only=_LINK_STRAINER)
     if soup is None:
         return 0
 
-    for a in soup.find_all("a", href=True):
+    # Only job-view anchors; the CSS selector filters them in soupsieve instead of a Python loop
+    for a in soup.select('a[href*="/jobs/view/"]'):
         # Check for stop signal periodically
-        if stop_signal and stop_signal[0]:
+        if stop_event and stop_event.is_set():
             print(f"  [User {user_id}] Stop signal detected during link processing. Handled {handled} links so far.")
             sys.stdout.flush()
             break
 
-        if "/jobs/view/" not in a["href"]:
-            continue
         handled += 1
 
         full = "https://www.linkedin.com" + a["href"] if a["href"].startswith("/") else a["href"]
@@ -105,71 +127,98 @@ def process_search_page_for_user(search, user_id: int, stop_signal=None) -> int:
         if job_id is None:
             continue
 
-        is_new = database.insert_stub(user_id, job_id, url, search["location"], search["keyword"])
-        if is_new or database.row_missing_details(user_id, job_id):
+        stubs.setdefault(job_id, (job_id, url, search["location"], search["keyword"]))
+
+    # Store all stubs from this page in a single transaction
+    new_ids = database.insert_stubs_batch(user_id, list(stubs.values()))
+    # Previously seen jobs still need fetching if their details never arrived
+    missing_ids = database.get_job_ids_missing_details(user_id, stubs.keys() - new_ids)
+    for job_id, (_, url, _, _) in stubs.items():
+        if job_id in new_ids or job_id in missing_ids:
             jobs_for_update.append({"job_id": job_id, "url": url, "user_id": user_id})
 
     # Process jobs with stop signal monitoring
-    if jobs_for_update and not (stop_signal and stop_signal[0]):
-        _process_jobs_for_user(jobs_for_update, user_id, stop_signal)
+    if jobs_for_update and not (stop_event and stop_event.is_set()):
+        _process_jobs_for_user(jobs_for_update, user_id, stop_event, session=session,
+                               exclusion_keywords=exclusion_keywords)
 
     return handled
 
 
-def _process_jobs_for_user(jobs_for_update, user_id: int, stop_signal=None):
-    """Process jobs for a specific user sequentially"""
+def _process_jobs_for_user(jobs_for_update, user_id: int, stop_event=None, session=None,
+                           exclusion_keywords: Optional[List[str]] = None):
+    """Fetch job pages concurrently, then analyze and persist them one at a time.
+
+    Page fetches are pure network wait, so they run on a thread pool; the AI
+    analysis stays serial because the LLM calls are rate-limited.
+    """
     processed = 0
     total = len(jobs_for_update)
 
-    for job_data in jobs_for_update:
-        # Check stop signal before each job
-        if stop_signal and stop_signal[0]:
-            print(f"  [User {user_id}] Stop signal detected. Processed {processed}/{total} jobs.")
-            sys.stdout.flush()
-            break
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as pool:
+        futures = {
+            pool.submit(_fetch_job_details, job_data, user_id, stop_event, session, exclusion_keywords): job_data
+            for job_data in jobs_for_update
+        }
+
+        for future in as_completed(futures):
+            job_data = futures[future]
+
+            # Check stop signal before each job
+            if stop_event and stop_event.is_set():
+                print(f"  [User {user_id}] Stop signal detected. Processed {processed}/{total} jobs.")
+                sys.stdout.flush()
+                pool.shutdown(wait=False, cancel_futures=True)
+                break
+
+            try:
+                details = future.result()
+                if details is not None:
+                    _analyze_and_persist(job_data, user_id, *details, stop_event)
+                processed += 1
+            except Exception as e:
+                print(f"  [User {user_id}] Error processing job {job_data.get('job_id')}: {e}")
+                processed += 1
 
-        try:
-            _fetch_and_update_for_user(job_data, user_id, stop_signal)
-            processed += 1
-        except Exception as e:
-            print(f"  [User {user_id}] Error processing job {job_data.get('job_id')}: {e}")
-            processed += 1
 
+def _fetch_job_details(job: dict, user_id: int, stop_event=None, session=None,
+                       exclusion_keywords: Optional[List[str]] = None) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """Network stage: fetch a job's title and description.
 
-def _fetch_and_update_for_user(job: dict, user_id: int, stop_signal=None) -> None:
-    """Fetch and update job details for a specific user"""
+    Returns None when the job needs no further processing (stopped or excluded).
+    """
     title = None
     desc = None
     linkedin_job_id = job["job_id"]
     job_url = job["url"]
 
-    # Get user config for exclusion keywords
-    from utils_multiuser import load_user_config
-    user_config = load_user_config(user_id)
-    exclusion_keywords = user_config.get("search_parameters", {}).get("exclusion_keywords", [])
+    # Get user config for exclusion keywords unless the caller already loaded them
+    if exclusion_keywords is None:
+        from utils_multiuser import get_user_config_value
+        exclusion_keywords = get_user_config_value(user_id, "search_parameters.exclusion_keywords", [])
 
-    soup = get_soup(job_url)
+    soup = get_soup(job_url, session=session)
     if soup:
         title = extract_job_title(soup)
         desc = extract_job_description(soup)
 
     # Check stop signal
-    if stop_signal and stop_signal[0]:
-        return
+    if stop_event and stop_event.is_set():
+        return None
 
     # Check exclusions against the title
     from evaluate import contains_exclusions
     if title and contains_exclusions(title, exclusion_keywords):
         database.mark_job_as_analyzed(user_id, linkedin_job_id)
-        return
+        return None
 
     # Check stop signal before guest fetch
-    if stop_signal and stop_signal[0]:
-        return
+    if stop_event and stop_event.is_set():
+        return None
 
     # Fallback to guest API if needed
     if title is None or desc is None:
-        g_title, g_desc = _fetch_guest(linkedin_job_id)
+        g_title, g_desc = _fetch_guest(linkedin_job_id, session=session)
         if title is None:
             title = g_title
         if desc is None:
@@ -178,10 +227,18 @@ def _fetch_and_update_for_user(job: dict, user_id: int, stop_signal=None) -> Non
     # Second exclusion check for title obtained from fallback
     if title and contains_exclusions(title, exclusion_keywords):
         database.mark_job_as_analyzed(user_id, linkedin_job_id)
-        return
+        return None
+
+    return title, desc
+
+
+def _analyze_and_persist(job: dict, user_id: int, title: Optional[str], desc: Optional[str], stop_event=None) -> None:
+    """Analysis stage: store fetched details, run the AI evaluation and record the outcome"""
+    linkedin_job_id = job["job_id"]
+    job_url = job["url"]
 
     # Check stop signal before database update
-    if stop_signal and stop_signal[0]:
+    if stop_event and stop_event.is_set():
         return
 
     # Update job details in database
@@ -189,11 +246,11 @@ def _fetch_and_update_for_user(job: dict, user_id: int, stop_signal=None) -> Non
         database.update_details(user_id, linkedin_job_id, title, desc)
 
     # Check stop signal before expensive AI analysis
-    if stop_signal and stop_signal[0]:
+    if stop_event and stop_event.is_set():
         return
 
-    # Perform AI analysis if we have a description
-    if desc and desc.strip():
+    # Perform AI analysis if we have a description and no earlier run already analyzed this job
+    if desc and desc.strip() and database.needs_analysis(user_id, linkedin_job_id):
         try:
             ai_response = analyze_job_for_user(job_description=desc, user_id=user_id)
 
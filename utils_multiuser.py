@@ -4,11 +4,33 @@ import os
 import sys
 import subprocess
 import json
+import copy
+import logging
 import threading
+import time
 from datetime import datetime
 from pathlib import Path
 import database_multiuser as database
 
+log = logging.getLogger(__name__)
+
+try:
+    # orjson is an optional, faster drop-in for the config/preset JSON stored in SQLite
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _dumpb = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+
+    def _dumpb(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
 # Database path
 DB_PATH = "jobfinder.db"
 
@@ -17,6 +39,63 @@ _user_scan_threads = {}
 _user_scan_stop_signals = {}
 _scan_lock = threading.Lock()
 
+# Loaded presets keyed by (user_id, preset_name); save/delete below drop stale entries
+PRESET_CACHE_SIZE = 128
+_preset_cache = {}
+# Bumped on every save/delete of a key, so a load that raced a write never caches the old row
+_preset_generations = {}
+_preset_cache_lock = threading.Lock()
+
+# SQL for the config/preset helpers, kept as module constants so every call passes the
+# same string and hits the connection's prepared-statement cache
+_SELECT_USER_CONFIG_DOC = """
+    SELECT config_json
+    FROM user_config_docs
+    WHERE user_id = ?
+"""
+_SELECT_LEGACY_USER_CONFIG = """
+    SELECT config_key, config_value
+    FROM user_configs
+    WHERE user_id = ?
+"""
+_SELECT_USER_CONFIG_VALUE = """
+    SELECT json_type(config_json, ?) AS value_type,
+           json_extract(config_json, ?) AS value
+    FROM user_config_docs
+    WHERE user_id = ?
+"""
+_SELECT_LEGACY_USER_CONFIG_VALUE = """
+    SELECT config_value
+    FROM user_configs
+    WHERE user_id = ? AND config_key = ?
+"""
+_UPSERT_USER_CONFIG_DOC = """
+    INSERT OR REPLACE INTO user_config_docs (user_id, config_json, updated_at)
+    VALUES (?, ?, CURRENT_TIMESTAMP)
+"""
+_DELETE_LEGACY_USER_CONFIG = "DELETE FROM user_configs WHERE user_id = ?"
+_SELECT_USER_PRESETS = """
+    SELECT preset_name, display_name, description, created_at
+    FROM user_presets
+    WHERE user_id = ?
+    ORDER BY created_at DESC
+"""
+_USER_PRESETS_COLUMNS = ('preset_name', 'display_name', 'description', 'created_at')
+_UPSERT_USER_PRESET = """
+    INSERT OR REPLACE INTO user_presets
+    (user_id, preset_name, display_name, description, config_data, created_at)
+    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+"""
+_SELECT_USER_PRESET = """
+    SELECT config_data, display_name, description
+    FROM user_presets
+    WHERE user_id = ? AND preset_name = ?
+"""
+_DELETE_USER_PRESET = """
+    DELETE FROM user_presets
+    WHERE user_id = ? AND preset_name = ?
+"""
+
 def ensure_database_initialized():
     """Ensure the database exists and is properly initialized"""
     if not Path(DB_PATH).exists():
@@ -27,10 +106,21 @@ def ensure_database_initialized():
     else:
         print("Database found.")
 
+    configure_database()
+
     # Reset all scan flags on startup since threads don't persist across restarts
     reset_all_scan_flags()
 
 
+def configure_database():
+    """Switch the database to WAL so config/preset reads don't block on writers"""
+    try:
+        with database.get_conn() as conn:
+            # journal_mode is stored in the database file, so this one call covers every connection
+            conn.execute("PRAGMA journal_mode=WAL")
+    except Exception as e:
+        log.warning("Could not configure database: %s", e)
+
 def reset_all_scan_flags():
     """Reset all scan control flags on app startup"""
     try:
@@ -41,16 +131,31 @@ def reset_all_scan_flags():
             """)
         print("✅ Reset scan control flags for all users")
     except Exception as e:
-        print(f"Warning: Could not reset scan flags: {e}")
+        log.warning("Could not reset scan flags: %s", e)
+
+# (epoch second, ISO string) for the last timestamp handed out by _iso_now
+_last_iso_now = [0, '']
+
+def _iso_now():
+    """Current local time as an ISO string, formatted at most once per second"""
+    now = int(time.time())
+    if now != _last_iso_now[0]:
+        _last_iso_now[:] = [now, datetime.fromtimestamp(now).isoformat()]
+    return _last_iso_now[1]
 
 def get_project_info():
     """Get project information for display"""
+    try:
+        database_size = os.stat(DB_PATH).st_size
+    except FileNotFoundError:
+        database_size = 0
+
     return {
         'version': '2.0.0-multiuser',
         'python_version': sys.version,
         'database_path': DB_PATH,
-        'database_size': Path(DB_PATH).stat().st_size if Path(DB_PATH).exists() else 0,
-        'last_updated': datetime.now().isoformat()
+        'database_size': database_size,
+        'last_updated': _iso_now()
     }
 
 def start_scan_for_user(user_id):
@@ -62,13 +167,12 @@ def start_scan_for_user(user_id):
         if user_id in _user_scan_threads and _user_scan_threads[user_id].is_alive():
             return False, "Scan is already running"
 
-        # Initialize stop signal for this user
-        _user_scan_stop_signals[user_id] = [False]
+        # Initialize stop event for this user
+        _user_scan_stop_signals[user_id] = threading.Event()
 
         try:
             # Reset stop flag and set scan as active in database
-            database.set_stop_scan_flag(user_id, False)
-            database.set_scan_active(user_id, True)
+            database.set_scan_state(user_id, stop=False, active=True)
 
             # Import scraping function
             from scrape_multiuser import scrape_phase_for_user
@@ -76,13 +180,12 @@ def start_scan_for_user(user_id):
             def scan_worker():
                 try:
                     scrape_phase_for_user(user_id, _user_scan_stop_signals[user_id])
-                except Exception as e:
-                    print(f"Error during scan for user {user_id}: {e}")
+                except Exception:
+                    log.exception("Error during scan for user %s", user_id)
                 finally:
                     # Reset stop signal and scan status when scan completes
-                    _user_scan_stop_signals[user_id][0] = False
-                    database.set_stop_scan_flag(user_id, False)
-                    database.set_scan_active(user_id, False)
+                    _user_scan_stop_signals[user_id].clear()
+                    database.set_scan_state(user_id, stop=False, active=False)
 
             # Start the scan thread
             _user_scan_threads[user_id] = threading.Thread(target=scan_worker, daemon=True)
@@ -110,10 +213,9 @@ def stop_scan_for_user(user_id):
         try:
             # Set stop signals
             if user_id in _user_scan_stop_signals:
-                _user_scan_stop_signals[user_id][0] = True
+                _user_scan_stop_signals[user_id].set()
 
-            database.set_stop_scan_flag(user_id, True)
-            database.set_scan_active(user_id, False)
+            database.set_scan_state(user_id, stop=True, active=False)
 
             return True, "Scan stop signal sent"
         except Exception as e:
@@ -122,81 +224,128 @@ def stop_scan_for_user(user_id):
 def load_user_config(user_id):
     """Load configuration for a specific user"""
     try:
-        with database.get_conn() as conn:
-            rows = conn.execute("""
-                SELECT config_key, config_value
-                FROM user_configs
-                WHERE user_id = ?
-            """, (user_id,)).fetchall()
-
-            if not rows:
-                # Return default configuration if user has no config
-                return get_default_config()
-
-            # Convert rows to config dictionary
-            config = {}
-            for row in rows:
-                key = row['config_key']
-                value = json.loads(row['config_value'])
-
-                # Parse nested keys (e.g., 'search_parameters.keywords')
-                keys = key.split('.')
-                current = config
-                for k in keys[:-1]:
-                    if k not in current:
-                        current[k] = {}
-                    current = current[k]
-                current[keys[-1]] = value
-
-            return config
+        # Stored keys override the defaults, so keys the user never saved still come through
+        flat = copy.deepcopy(_DEFAULT_FLAT)
+        with database.pooled_conn() as conn:
+            row = conn.execute(_SELECT_USER_CONFIG_DOC, (user_id,)).fetchone()
 
-    except Exception as e:
-        print(f"Error loading user config: {e}")
+            if row:
+                flat.update(flatten_dict(_loads(row['config_json'])))
+            else:
+                # Fall back to the per-key rows written before configs were stored as one document
+                rows = conn.execute(_SELECT_LEGACY_USER_CONFIG, (user_id,)).fetchall()
+                loads = _loads
+                for key, raw_value in rows:
+                    flat[key] = loads(raw_value)
+
+        return unflatten_dict(flat)
+
+    except Exception:
+        log.exception("Error loading user config")
         return get_default_config()
 
+def get_user_config_value(user_id, key, default=None):
+    """Read a single dotted config key (e.g. 'search_parameters.keywords') for a user"""
+    try:
+        with database.pooled_conn() as conn:
+            # Let SQLite pull the one field out of the stored document
+            row = conn.execute(_SELECT_USER_CONFIG_VALUE, ('$.' + key, '$.' + key, user_id)).fetchone()
+
+            if row is None:
+                row = conn.execute(_SELECT_LEGACY_USER_CONFIG_VALUE, (user_id, key)).fetchone()
+                if row:
+                    return _loads(row['config_value'])
+            elif row['value_type'] is not None:
+                value_type, value = row['value_type'], row['value']
+                if value_type in ('object', 'array'):
+                    return _loads(value)
+                if value_type in ('true', 'false'):
+                    return value_type == 'true'
+                return value
+
+    except Exception:
+        log.exception("Error loading user config value %s", key)
+
+    return copy.deepcopy(_DEFAULT_FLAT.get(key, default))
+
 def save_user_config(user_id, config_data):
     """Save configuration for a specific user"""
     try:
-        with database.get_conn() as conn:
-            # Flatten the config dictionary for storage
-            flat_config = flatten_dict(config_data)
+        with database.pooled_conn() as conn:
+            # Take the write lock up front so the read-merge-write below can't interleave with another save
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Forms post only part of the config; keep every stored key they don't send
+            row = conn.execute(_SELECT_USER_CONFIG_DOC, (user_id,)).fetchone()
+            if row:
+                stored = _loads(row['config_json'])
+            else:
+                rows = conn.execute(_SELECT_LEGACY_USER_CONFIG, (user_id,)).fetchall()
+                stored = unflatten_dict({key: _loads(raw_value) for key, raw_value in rows})
+            merged = _deep_merge(stored, config_data)
+
+            # The whole config is stored as one JSON document per user
+            conn.execute(_UPSERT_USER_CONFIG_DOC, (user_id, _dumps(merged)))
 
-            for key, value in flat_config.items():
-                conn.execute("""
-                    INSERT OR REPLACE INTO user_configs (user_id, config_key, config_value, updated_at)
-                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                """, (user_id, key, json.dumps(value)))
+            # Per-key rows are superseded by the document
+            conn.execute(_DELETE_LEGACY_USER_CONFIG, (user_id,))
 
             return True
 
-    except Exception as e:
-        print(f"Error saving user config: {e}")
+    except Exception:
+        log.exception("Error saving user config")
         return False
 
 def flatten_dict(d, parent_key='', sep='.'):
     """Flatten a nested dictionary"""
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
+    items = {}
+    # Walk with an explicit stack of iterators so keys keep their original order
+    stack = [(parent_key, iter(d.items()))]
+    while stack:
+        prefix, it = stack[-1]
+        for k, v in it:
+            new_key = f"{prefix}{sep}{k}" if prefix else k
+            if type(v) is dict:
+                stack.append((new_key, iter(v.items())))
+                break
+            items[new_key] = v
         else:
-            items.append((new_key, v))
-    return dict(items)
-
-def get_default_config():
-    """Get default configuration for new users"""
-    return {
-        'search_parameters': {
-            'keywords': ['software engineer', 'developer', 'programmer'],
-            'locations': ['Remote', 'New York', 'San Francisco'],
-            'experience_level': 'entry',
-            'job_type': 'full-time',
-            'max_jobs_per_search': 50,
-            'exclusion_keywords': []
-        },
-        'prompts': {
-            'evaluation_prompt': """Please evaluate this job posting based on the following criteria:
+            stack.pop()
+    return items
+
+def unflatten_dict(d, sep='.'):
+    """Rebuild a nested dictionary from flatten_dict output"""
+    result = {}
+    for key, value in d.items():
+        # Parse nested keys (e.g., 'search_parameters.keywords')
+        *parents, leaf = key.split(sep)
+        current = result
+        for k in parents:
+            current = current.setdefault(k, {})
+        current[leaf] = value
+    return result
+
+def _deep_merge(base, overrides):
+    """Merge *overrides* into *base* in place; nested dicts merge, anything else replaces"""
+    for k, v in overrides.items():
+        if type(v) is dict and type(base.get(k)) is dict:
+            _deep_merge(base[k], v)
+        else:
+            base[k] = v
+    return base
+
+# Default configuration for new users; built once, handed out as deep copies
+_DEFAULT_CONFIG = {
+    'search_parameters': {
+        'keywords': ['software engineer', 'developer', 'programmer'],
+        'locations': ['Remote', 'New York', 'San Francisco'],
+        'experience_level': 'entry',
+        'job_type': 'full-time',
+        'max_jobs_per_search': 50,
+        'exclusion_keywords': []
+    },
+    'prompts': {
+        'evaluation_prompt': """Please evaluate this job posting based on the following criteria:
 
 MUST-HAVE Criteria (job must meet ALL of these):
 - Must NOT require any security clearance
@@ -210,91 +359,110 @@ Do NOT reject the job solely for:
 - Asking for 1-2 years of experience
 - Requiring specific tools experience
 - Listing certifications as requirements (unless explicitly marked as "must have before starting")"""
-        },
-        'resume': {
-            'text': ''
-        },
-        'api_keys': {
-            'openai_api_key': '',
-            'linkedin_email': '',
-            'linkedin_password': ''
-        },
-        'general': {
-            'scan_interval_minutes': 60,
-            'auto_approve_threshold': 0.7,
-            'enable_notifications': False,
-            'ai_provider': 'openai'
-        }
+    },
+    'resume': {
+        'text': ''
+    },
+    'api_keys': {
+        'openai_api_key': '',
+        'linkedin_email': '',
+        'linkedin_password': ''
+    },
+    'general': {
+        'scan_interval_minutes': 60,
+        'auto_approve_threshold': 0.7,
+        'enable_notifications': False,
+        'ai_provider': 'openai'
     }
+}
+
+def get_default_config():
+    """Get default configuration for new users"""
+    return copy.deepcopy(_DEFAULT_CONFIG)
+
+# Flattened view of the defaults, keyed like user_configs.config_key
+_DEFAULT_FLAT = flatten_dict(_DEFAULT_CONFIG)
+
 
 def get_user_presets(user_id):
     """Get configuration presets for a specific user"""
     try:
-        with database.get_conn() as conn:
-            rows = conn.execute("""
-                SELECT preset_name, display_name, description, created_at
-                FROM user_presets
-                WHERE user_id = ?
-                ORDER BY created_at DESC
-            """, (user_id,)).fetchall()
+        with database.pooled_conn() as conn:
+            # Plain tuples zipped straight into the dicts jsonify/templates need,
+            # skipping the intermediate sqlite3.Row per preset
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(_SELECT_USER_PRESETS, (user_id,))
 
-            return [dict(row) for row in rows]
+            return [dict(zip(_USER_PRESETS_COLUMNS, row)) for row in cursor]
 
-    except Exception as e:
-        print(f"Error loading user presets: {e}")
+    except Exception:
+        log.exception("Error loading user presets")
         return []
 
 def save_user_preset(user_id, preset_name, config_data, display_name=None, description=None):
     """Save a configuration preset for a specific user"""
     try:
-        with database.get_conn() as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO user_presets
-                (user_id, preset_name, display_name, description, config_data, created_at)
-                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (user_id, preset_name, display_name, description, json.dumps(config_data)))
+        with database.pooled_conn() as conn:
+            # Stored as raw UTF-8 JSON bytes; _loads reads bytes and older TEXT rows alike
+            conn.execute(_UPSERT_USER_PRESET, (user_id, preset_name, display_name, description, _dumpb(config_data)))
 
-            return True
+        _invalidate_preset(user_id, preset_name)
+        return True
 
-    except Exception as e:
-        print(f"Error saving user preset: {e}")
+    except Exception:
+        log.exception("Error saving user preset")
         return False
 
 def load_user_preset(user_id, preset_name):
     """Load a specific preset for a user"""
+    cache_key = (user_id, preset_name)
+    cached = _preset_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    generation = _preset_generations.get(cache_key, 0)
     try:
-        with database.get_conn() as conn:
-            row = conn.execute("""
-                SELECT config_data, display_name, description
-                FROM user_presets
-                WHERE user_id = ? AND preset_name = ?
-            """, (user_id, preset_name)).fetchone()
+        with database.pooled_conn() as conn:
+            row = conn.execute(_SELECT_USER_PRESET, (user_id, preset_name)).fetchone()
 
             if row:
-                return {
-                    'config': json.loads(row['config_data']),
+                preset = {
+                    'config': _loads(row['config_data']),
                     'display_name': row['display_name'],
                     'description': row['description']
                 }
+                with _preset_cache_lock:
+                    # Skip caching if the preset was saved or deleted since the generation was read
+                    if _preset_generations.get(cache_key, 0) == generation:
+                        if len(_preset_cache) >= PRESET_CACHE_SIZE:
+                            # Evict the oldest entry
+                            _preset_cache.pop(next(iter(_preset_cache)))
+                        _preset_cache[cache_key] = preset
+                return copy.deepcopy(preset)
 
             return None
 
-    except Exception as e:
-        print(f"Error loading user preset: {e}")
+    except Exception:
+        log.exception("Error loading user preset")
         return None
 
 def delete_user_preset(user_id, preset_name):
     """Delete a preset for a user"""
     try:
-        with database.get_conn() as conn:
-            cursor = conn.execute("""
-                DELETE FROM user_presets
-                WHERE user_id = ? AND preset_name = ?
-            """, (user_id, preset_name))
+        with database.pooled_conn() as conn:
+            cursor = conn.execute(_DELETE_USER_PRESET, (user_id, preset_name))
 
-            return cursor.rowcount > 0
+        _invalidate_preset(user_id, preset_name)
+        return cursor.rowcount > 0
 
-    except Exception as e:
-        print(f"Error deleting user preset: {e}")
+    except Exception:
+        log.exception("Error deleting user preset")
         return False
 
+def _invalidate_preset(user_id, preset_name):
+    """Drop a cached preset after it is saved or deleted"""
+    cache_key = (user_id, preset_name)
+    with _preset_cache_lock:
+        _preset_generations[cache_key] = _preset_generations.get(cache_key, 0) + 1
+        _preset_cache.pop(cache_key, None)